@@ -1,4 +1,7 @@
+from collections import deque
+from functools import reduce
 from itertools import combinations
+from operator import or_
 import random
 import shutil
 import subprocess
@@ -12,6 +15,43 @@ PROVER9_PATH = "bin/prover9"
 DIR_NAME = "mace4_prompts"
 DIR_OUTPUT = "mace4_responses"
 
+# Sentences with more cells than this encode "at most N mines" with a
+# sequential counter instead of negating every (N+1)-subset of their cells
+NAIVE_AT_MOST_MAX_CELLS = 4
+
+# Upper bound on a single Mace4 search, in seconds; the search for a
+# model that does not exist is exhaustive and may otherwise never finish
+MACE4_MAX_SECONDS = 10
+
+# Mace4 exit statuses: a model was found, or the whole domain was
+# searched without finding one
+MACE4_MODEL_FOUND = 0
+MACE4_EXHAUSTED = 2
+
+# Patterns used to read Mace4 output, compiled once
+_INTERP_RE = re.compile(
+    r"interpretation\(\s*(\d+),\s*\[number\s*=\s*(\d+),seconds\s*=\s*(\d+)\]"
+)
+_FUNC_RE = re.compile(r"function\(([^)]+)\),\s*(\d+)")
+
+
+def neighbor_table(height, width):
+    """
+    Returns a dict mapping every cell of a height x width board
+    to a tuple of the cells within one row and column of it,
+    not including the cell itself.
+    """
+    return {
+        (i, j): tuple(
+            (ni, nj)
+            for ni in range(max(0, i - 1), min(height, i + 2))
+            for nj in range(max(0, j - 1), min(width, j + 2))
+            if (ni, nj) != (i, j)
+        )
+        for i in range(height)
+        for j in range(width)
+    }
+
 
 class Minesweeper:
     """
@@ -22,23 +62,22 @@ class Minesweeper:
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Pick distinct mine positions in one draw
+        positions = random.sample(range(self.height * self.width), mines)
+        self.mines = {divmod(position, self.width) for position in positions}
+
+        # Initialize the field and place the mines on it
+        self.board = [[False] * self.width for _ in range(self.height)]
+        for i, j in self.mines:
+            self.board[i][j] = True
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Count the mines around every cell once, so lookups are constant time
+        self.neighbors = neighbor_table(self.height, self.width)
+        self.neighbor_counts = [[0] * self.width for _ in range(self.height)]
+        for mine in self.mines:
+            for i, j in self.neighbors[mine]:
+                self.neighbor_counts[i][j] += 1
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -68,23 +107,8 @@ class Minesweeper:
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return self.neighbor_counts[i][j]
 
     def won(self):
         """
@@ -96,54 +120,65 @@ class Minesweeper:
 class Sentence:
     """
     Logical statement about a Minesweeper game
-    A sentence consists of a set of board cells,
-    and a count of the number of those cells which are mines.
+    A sentence consists of a set of board cells, stored as a bitmask
+    with one bit per cell, and a count of the number of those cells
+    which are mines.
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{self.cells:#b} = {self.count}"
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitmask of all cells in self.cells known to be mines.
         """
-        if len(self.cells) == self.count and self.count != 0:
+        if self.cells.bit_count() == self.count and self.count != 0:
             return self.cells
-        else:
-            return set()
+        return 0
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of all cells in self.cells known to be safe.
         """
         if self.count == 0:
             return self.cells
-        else:
-            return set()
+        return 0
 
-    def mark_mine(self, cell):
+    def mark_mine(self, bit):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        Returns the sentence that follows given the fact that
+        the cell with the given bit is known to be a mine.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
+        if self.cells & bit:
+            return Sentence(self.cells & ~bit, self.count - 1)
+        return self
 
-    def mark_safe(self, cell):
+    def mark_safe(self, bit):
+        """
+        Returns the sentence that follows given the fact that
+        the cell with the given bit is known to be safe.
+        """
+        if self.cells & bit:
+            return Sentence(self.cells & ~bit, self.count)
+        return self
+
+    def subtract(self, other):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        Returns the sentence left after removing the cells of a sentence
+        whose cells are a subset of this one, along with the mines they
+        account for.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        return Sentence(self.cells & ~other.cells, self.count - other.count)
 
 
 class MinesweeperAI:
@@ -158,174 +193,248 @@ class MinesweeperAI:
 
         self.step = 0
 
+        # Sentences refer to cell (i, j) by bit i * width + j of a bitmask
+        self._bit = {
+            (i, j): 1 << (i * self.width + j)
+            for i in range(self.height)
+            for j in range(self.width)
+        }
+        self._bit_to_cell = {bit: cell for cell, bit in self._bit.items()}
+
+        # Bitmask of the cells around every cell of the board, computed once
+        self._neighbor_masks = {
+            cell: sum(self._bit[neighbor] for neighbor in neighbors)
+            for cell, neighbors in neighbor_table(self.height, self.width).items()
+        }
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
+        self._mine_mask = 0
+        self._safe_mask = 0
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
-
-        for filename in os.listdir(DIR_NAME):
-            file_path = os.path.join(DIR_NAME, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                print(f"Failed to delete {file_path}. Reason: {e}")
-
-        for filename in os.listdir(DIR_OUTPUT):
-            file_path = os.path.join(DIR_OUTPUT, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                print(f"Failed to delete {file_path}. Reason: {e}")
+        # Sentences about the game known to be true, keyed by their cells
+        # so that each set of cells is only stored once
+        self.knowledge = {}
+
+        # Sentences added to the knowledge base that the inference loop
+        # has not looked at yet
+        self._work = deque()
+
+        # Cells and counts of the knowledge Mace4 was last run on
+        self._emitted = {}
+
+        # Start every game with empty prompt and response directories
+        for directory in (DIR_NAME, DIR_OUTPUT):
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory, exist_ok=True)
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        bit = self._bit[cell]
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._mine_mask |= bit
+        for sentence in list(self.knowledge.values()):
+            self._replace_sentence(sentence, sentence.mark_mine(bit))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        bit = self._bit[cell]
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self._safe_mask |= bit
+        for sentence in list(self.knowledge.values()):
+            self._replace_sentence(sentence, sentence.mark_safe(bit))
+
+    def _add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and queues it for inference,
+        unless it has no cells or its cells are already known.
+        """
+        if sentence.cells and sentence.cells not in self.knowledge:
+            self.knowledge[sentence.cells] = sentence
+            self._work.append(sentence)
+
+    def _replace_sentence(self, old, new):
+        """
+        Replaces a sentence in the knowledge base with one derived from it.
+        """
+        if new is not old:
+            del self.knowledge[old.cells]
+            self._add_sentence(new)
+
+    def _cells(self, mask):
+        """
+        Returns the list of cells whose bits are set in a bitmask.
+        """
+        cells = []
+        while mask:
+            bit = mask & -mask
+            cells.append(self._bit_to_cell[bit])
+            mask ^= bit
+        return cells
 
     def run_mace4_prompt(self):
         """
         Generates the input file for Mace4, including safe cells, and reflects the current step.
+        Returns the prompt text.
         """
         file_name = f"{DIR_NAME}/mace4_step_{self.step}.in"
 
+        # Format every literal once instead of inside the combinatorial loops
+        cells_in_knowledge = self._cells(reduce(or_, self.knowledge, 0))
+        lit = {cell: f"mine({cell[0]},{cell[1]})" for cell in cells_in_knowledge}
+        neg = {cell: "-" + lit[cell] for cell in cells_in_knowledge}
+
         def generate_at_least_disjunctions(cells, count):
             if count == 0:
                 # No mines, negate all cells
-                return " & ".join([f"-mine({cell[0]},{cell[1]})" for cell in cells])
-            disjunctions = []
-            for comb in combinations(cells, count):
-                clause = [f"mine({cell[0]},{cell[1]})" for cell in comb]
-                disjunctions.append(f"({' & '.join(clause)})")
-            return " | ".join(disjunctions)
+                return " & ".join(neg[cell] for cell in cells)
+            return " | ".join(
+                "(" + " & ".join(lit[cell] for cell in comb) + ")"
+                for comb in combinations(cells, count)
+            )
 
         def generate_at_most_disjunctions(cells, count):
             if count == 0:
                 # No mines, negate all cells
-                return ".\n".join([f"-mine({cell[0]},{cell[1]})" for cell in cells])
-            disjunctions = []
-            for comb in combinations(cells, count + 1):
-                clause = [f"mine({cell[0]},{cell[1]})" for cell in comb]
-                disjunctions.append(f"-({' & '.join(clause)})")
-            return ".\n".join(disjunctions)
+                return ".\n".join(neg[cell] for cell in cells)
+            return ".\n".join(
+                "-(" + " & ".join(lit[cell] for cell in comb) + ")"
+                for comb in combinations(cells, count + 1)
+            )
 
-        with open(file_name, "w") as f:
-            f.write(f"% Mace4 input: Minesweeper problem - Step {self.step}\n")
-            f.write("formulas(assumptions).\n")
-            # Add known safe cells to assumptions
-            f.write("% Known safe cells\n")
-            for cell in self.safes:
-                f.write(f"-mine({cell[0]},{cell[1]}).\n")
-            # Add constraints from knowledge
-            for sentence in self.knowledge:
-                cells = list(sentence.cells)
-                if sentence.count == 0:
-                    # No mines: negate mines for all cells
-                    disjunction = generate_at_least_disjunctions(cells, sentence.count)
-                    if disjunction:
-                        f.write(disjunction + "\n")
-                elif sentence.count == len(cells):
-                    # All cells are mines
-                    for cell in cells:
-                        f.write(f"mine({cell[0]},{cell[1]}).\n")
-                else:
-                    # General case: at least N mines, at most N mines
-                    at_least_disjunction = generate_at_least_disjunctions(
-                        cells, sentence.count
-                    )
+        def generate_sequential_counter(cells, count, counter):
+            # Sinz's sequential counter: counter(i,j) holds when at least j
+            # of the first i + 1 cells are mines, which is never allowed to
+            # exceed count. Needs O(len(cells) * count) clauses.
+            def s(i, j):
+                return f"{counter}({i},{j})"
+
+            last = len(cells) - 1
+            clauses = [f"{lit[cells[0]]} -> {s(0, 1)}"]
+            clauses.extend(f"-{s(0, j)}" for j in range(2, count + 1))
+            for i in range(1, last):
+                mine = lit[cells[i]]
+                clauses.append(f"{mine} -> {s(i, 1)}")
+                clauses.append(f"{s(i - 1, 1)} -> {s(i, 1)}")
+                for j in range(2, count + 1):
+                    clauses.append(f"{mine} & {s(i - 1, j - 1)} -> {s(i, j)}")
+                    clauses.append(f"{s(i - 1, j)} -> {s(i, j)}")
+                clauses.append(f"-({mine} & {s(i - 1, count)})")
+            clauses.append(f"-({lit[cells[last]]} & {s(last - 1, count)})")
+            return ".\n".join(clauses)
+
+        # Build the whole prompt in memory and write it out in one call
+        parts = []
+        parts.append(f"% Mace4 input: Minesweeper problem - Step {self.step}\n")
+        parts.append("formulas(assumptions).\n")
+        # Add known safe cells to assumptions
+        parts.append("% Known safe cells\n")
+        for cell in self.safes:
+            parts.append(f"-mine({cell[0]},{cell[1]}).\n")
+        # Add constraints from knowledge
+        for sentence_id, sentence in enumerate(self.knowledge.values()):
+            cells = self._cells(sentence.cells)
+            if sentence.count == 0:
+                # No mines: negate mines for all cells
+                disjunction = generate_at_least_disjunctions(cells, sentence.count)
+                if disjunction:
+                    parts.append(disjunction + ".\n")
+            elif sentence.count == len(cells):
+                # All cells are mines
+                for cell in cells:
+                    parts.append(lit[cell] + ".\n")
+            else:
+                # General case: at least N mines, at most N mines
+                at_least_disjunction = generate_at_least_disjunctions(
+                    cells, sentence.count
+                )
+                if len(cells) <= NAIVE_AT_MOST_MAX_CELLS:
                     at_most_disjunction = generate_at_most_disjunctions(
                         cells, sentence.count
                     )
-                    if at_least_disjunction:
-                        f.write(f"% At least {sentence.count} mines\n")
-                        f.write(at_least_disjunction + ".\n")
-                    if at_most_disjunction:
-                        f.write(f"% At most {sentence.count} mines\n")
-                        f.write(at_most_disjunction + ".\n")
-
-            f.write("end_of_list.\n\n")
-
-            f.write("formulas(goals).\n")
-
-            # Add constraints for goals
-            for sentence in self.knowledge:
-                cells = list(sentence.cells)
-                if sentence.count == 0:
-                    # No mines: negate mines for all cells
-                    disjunction = generate_at_least_disjunctions(cells, sentence.count)
-                    if disjunction:
-                        f.write(disjunction + "\n")
-                elif sentence.count == len(cells):
-                    # All cells are mines
-                    for cell in cells:
-                        f.write(f"mine({cell[0]},{cell[1]}).\n")
                 else:
-                    # General case: at least N mines
-                    at_least_disjunction = generate_at_least_disjunctions(
-                        cells, sentence.count
+                    at_most_disjunction = generate_sequential_counter(
+                        cells, sentence.count, f"cnt{sentence_id}"
                     )
-                    if at_least_disjunction:
-                        f.write(f"% At least {sentence.count} mines\n")
-                        f.write(at_least_disjunction + ".\n")
-
-            f.write("end_of_list.\n")
-
-    def run_mace4(self):
-        """
-        Runs Mace4 on the generated input file
-        """
-        try:
-            result = subprocess.run([MACE4_PATH], capture_output=True, text=True)
-        except FileNotFoundError:
-            result = subprocess.run(["mace4"], capture_output=True, text=True)
+                if at_least_disjunction:
+                    parts.append(f"% At least {sentence.count} mines\n")
+                    parts.append(at_least_disjunction + ".\n")
+                if at_most_disjunction:
+                    parts.append(f"% At most {sentence.count} mines\n")
+                    parts.append(at_most_disjunction + ".\n")
 
+        parts.append("end_of_list.\n")
 
-        with open(f"{DIR_OUTPUT}/output_step_{self.step}.out", "w") as f:
-            f.write(result.stdout)
-        return result.stdout
+        prompt = "".join(parts)
+        with open(file_name, "w") as f:
+            f.write(prompt)
+        return prompt
 
-    def parse_mace4_output(self, output):
+    def run_mace4(self, prompt, cell):
         """
-        Parses the output from Mace4 and updates the AI's knowledge base.
+        Runs Mace4 on the prompt with the extra assumption that cell is a mine.
+        Returns True if Mace4 found a model, False if it proved that there is
+        none (so the cell must be safe), and None if the search was cut off or
+        Mace4 could not be started.
         """
-        for line in output.splitlines():
-            if line.startswith("mine("):
-                cell = tuple(map(int, line[5:-1].split(",")))
-                self.mark_mine(cell)
-            elif line.startswith("-mine("):
-                cell = tuple(map(int, line[6:-2].split(",")))
-                self.mark_safe(cell)
+        # The domain must hold every board coordinate and every index used by
+        # the sequential counters (a sentence has at most 8 cells). Fixing
+        # the size stops Mace4 retrying ever larger domains, but a search
+        # with no model to find can still run for a very long time, so it is
+        # also cut off after MACE4_MAX_SECONDS.
+        domain_size = str(max(self.height, self.width, 8))
+        args = ["-n", domain_size, "-N", domain_size, "-t", str(MACE4_MAX_SECONDS)]
+        query = f"formulas(assumptions).\nmine({cell[0]},{cell[1]}).\nend_of_list.\n"
+
+        # Only the exit status is read; the output is kept for inspection
+        output_name = f"{DIR_OUTPUT}/output_step_{self.step}_{cell[0]}_{cell[1]}.out"
+        with open(output_name, "w") as f:
+            # Fall back to a mace4 on the PATH, and to no answer at all when
+            # Mace4 cannot be started (missing, or not executable)
+            for executable in (MACE4_PATH, "mace4"):
+                try:
+                    result = subprocess.run(
+                        [executable, *args],
+                        input=prompt + query,
+                        stdout=f,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                    )
+                    break
+                except OSError:
+                    continue
+            else:
+                return None
+
+        if result.returncode == MACE4_MODEL_FOUND:
+            return True
+        if result.returncode == MACE4_EXHAUSTED:
+            return False
+        return None
 
     def make_prediction(self):
         """
-        Uses Mace4 to make a prediction about the Minesweeper board.
+        Uses Mace4 to make a prediction about the Minesweeper board:
+        every undecided cell in the knowledge base that cannot be a mine
+        is marked as safe.
         """
-        self.generate_mace4_input()
-        output = self.run_mace4()
-        self.parse_mace4_output(output)
+        prompt = self.run_mace4_prompt()
+        frontier = reduce(or_, self.knowledge, 0)
+        for cell in self._cells(frontier):
+            if self.run_mace4(prompt, cell) is False:
+                self.mark_safe(cell)
+        self._infer()
+        self.write_interpretation_file()
 
     def add_knowledge(self, cell, count):
         """
@@ -334,49 +443,51 @@ class MinesweeperAI:
         """
         self.moves_made.add(cell)
         self.mark_safe(cell)
-        neighbours = set()
-
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                if (i, j) == cell or (i, j) in self.safes:
-                    continue
-                if (i, j) in self.mines:
-                    count = count - 1
-                    continue
-
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    neighbours.add((i, j))
-
-        self.knowledge.append(Sentence(neighbours, count))
-
-        safes = set()
-        mines = set()
+        neighbours = self._neighbor_masks[cell] & ~self._safe_mask
+        count -= (neighbours & self._mine_mask).bit_count()
+        neighbours &= ~self._mine_mask
 
-        for sentence in self.knowledge:
-            safes = safes.union(sentence.known_safes())
-            mines = mines.union(sentence.known_mines())
+        self._add_sentence(Sentence(neighbours, count))
+        self._infer()
 
-        if safes:
-            for safe in safes:
-                self.mark_safe(safe)
-        if mines:
-            for mine in mines:
-                self.mark_mine(mine)
-
-        for sentence_1 in self.knowledge:
-            for sentence_2 in self.knowledge:
-                if sentence_1.cells == sentence_2.cells:
+    def _infer(self):
+        """
+        Draws every conclusion that follows from the sentences added or
+        changed since the last call. Only those can lead to new inferences,
+        so work through them until none are left.
+        """
+        while self._work:
+            sentence_1 = self._work.popleft()
+            if self.knowledge.get(sentence_1.cells) is not sentence_1:
+                # Replaced or dropped since it was queued
+                continue
+
+            # Same checks as known_safes/known_mines, without building
+            # an empty result for the common case where neither applies
+            if sentence_1.count == 0:
+                for safe in self._cells(sentence_1.cells):
+                    self.mark_safe(safe)
+                continue
+            if sentence_1.cells.bit_count() == sentence_1.count:
+                for mine in self._cells(sentence_1.cells):
+                    self.mark_mine(mine)
+                continue
+
+            for sentence_2 in list(self.knowledge.values()):
+                if sentence_2 is sentence_1:
                     continue
-                if sentence_1.cells.issubset(sentence_2.cells):
-                    sentence_2.cells -= sentence_1.cells
-                    sentence_2.count -= sentence_1.count
+                if sentence_1.cells & ~sentence_2.cells == 0:
+                    self._replace_sentence(sentence_2, sentence_2.subtract(sentence_1))
+                elif sentence_2.cells & ~sentence_1.cells == 0:
+                    self._replace_sentence(sentence_1, sentence_1.subtract(sentence_2))
+                    break
 
-    def interpret_mace4_output(self, output):
+    def write_interpretation_file(self):
         """
-        Parses the output from Mace4 and updates the AI's knowledge base.
-        Writes the output to a file.
+        Writes the cells currently known to be safe or mines as a
+        Mace4-style interpretation, next to Mace4's own output.
         """
-        output_filename = f"{DIR_OUTPUT}/output_step_{self.step}.out"
+        output_filename = f"{DIR_OUTPUT}/interpretation_step_{self.step}.out"
         with open(output_filename, "w") as f:
             f.write(f"interpretation( 8, [number = {self.step},seconds = {dt.now().second}], [\n")
 
@@ -403,21 +514,19 @@ class MinesweeperAI:
                 for j in range(self.width):
                     mine_values.append(1 if (i, j) in self.mines else 0)
 
+    @staticmethod
     def parse_interpretation_file(file_path):
         with open(file_path, "r") as file:
             content = file.read()
 
         # Extract the interpretation number, number, and seconds
-        interpretation_match = re.search(
-            r"interpretation\(\s*(\d+),\s*\[number\s*=\s*(\d+),seconds\s*=\s*(\d+)\]",
-            content,
-        )
+        interpretation_match = _INTERP_RE.search(content)
         interpretation_number = int(interpretation_match.group(1))
         number = int(interpretation_match.group(2))
         seconds = int(interpretation_match.group(3))
 
         # Extract the functions
-        functions = re.findall(r"function\(([^)]+)\),\s*(\d+)", content)
+        functions = _FUNC_RE.findall(content)
 
         parsed_data = {
             "interpretation_number": interpretation_number,
@@ -436,21 +545,33 @@ class MinesweeperAI:
 
 
     def mace4_wrapper(self):
+        """
+        Returns a safe move that has not been made yet, or None.
+        Mace4 is only run when inference in add_knowledge has not
+        already found one, and the knowledge changed since its last run.
+        """
         self.step += 1
-        self.run_mace4_prompt()
 
         safe_moves = self.safes - self.moves_made
+        if not safe_moves and self.knowledge:
+            # Mace4 starts from scratch on every run, so it can only tell
+            # us something new if the knowledge it is given has changed
+            emitted = {cells: s.count for cells, s in self.knowledge.items()}
+            if emitted != self._emitted:
+                self._emitted = emitted
+                self.make_prediction()
+                safe_moves = self.safes - self.moves_made
+
         if safe_moves:
-            move = random.choice(list(safe_moves))
-            self.parse_mace4_output(move)
-            return move
+            return random.choice(tuple(safe_moves))
         return None
 
     def mace4_move(self):
-        i = 0
-        while i < 63:
-            rand = (random.randrange(self.height), random.randrange(self.width))
-            if rand not in self.moves_made and rand not in self.mines:
-                return rand
-            i += 1
+        """
+        Returns a random move among the cells that have not been chosen
+        and are not known to be mines, or None if there are none left.
+        """
+        choices = self._bit.keys() - self.moves_made - self.mines
+        if choices:
+            return random.choice(tuple(choices))
         return None
@@ -45,6 +45,25 @@ flag = pygame.transform.scale(flag, (cell_size, cell_size))
 mine = pygame.image.load("assets/images/mine.png")
 mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
+# Pre-render the neighbour counts, a cell has at most 8 neighbours
+digits = {n: small_font.render(str(n), True, BLACK) for n in range(9)}
+
+# Board cells never move, so compute their rects and draw the grid once
+cells = []
+for i in range(HEIGHT):
+    row = []
+    for j in range(WIDTH):
+        rect = pygame.Rect(board_origin[0] + j * cell_size, board_origin[1] + i * cell_size, cell_size, cell_size)
+        row.append(rect)
+    cells.append(row)
+
+board_background = pygame.Surface(size)
+board_background.fill(DARK_BLUE)
+for row in cells:
+    for rect in row:
+        pygame.draw.rect(board_background, ORANGE, rect)
+        pygame.draw.rect(board_background, BLUE, rect, 3)
+
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
@@ -61,18 +80,34 @@ def draw_text(text, font, color, center):
     text_rect.center = center
     screen.blit(rendered_text, text_rect)
 
-def draw_button(rect, text, font, text_color, bg_color):
-    pygame.draw.rect(screen, bg_color, rect)
-    draw_text(text, font, text_color, rect.center)
+def render_button(rect, text, font, text_color, bg_color):
+    surface = pygame.Surface(rect.size)
+    surface.fill(bg_color)
+    rendered_text = font.render(text, True, text_color)
+    surface.blit(rendered_text, rendered_text.get_rect(center=surface.get_rect().center))
+    return surface
+
+# Buttons never change, so render them once: index 0 is normal, 1 is hovered
+play_button_rect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
+play_button = [render_button(play_button_rect, "Play Game", medium_font, TEXT_COLOR, color) for color in (BUTTON_COLOR, BUTTON_HOVER_COLOR)]
+ai_button_rect = pygame.Rect((2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50, (width / 3) - BOARD_PADDING * 2, 50)
+ai_button = [render_button(ai_button_rect, "AI Move", medium_font, TEXT_COLOR, color) for color in (BUTTON_COLOR, BUTTON_HOVER_COLOR)]
+reset_button_rect = pygame.Rect((2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 90, (width / 3) - BOARD_PADDING * 2, 50)
+reset_button = [render_button(reset_button_rect, "Reset", medium_font, TEXT_COLOR, color) for color in (BUTTON_COLOR, BUTTON_HOVER_COLOR)]
+
+status_texts = {text: medium_font.render(text, True, TEXT_COLOR) for text in ("Lost", "Won")}
+status_center = ((5 / 6) * width, (2 / 3) * height)
 
 while True:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
 
-    screen.fill(DARK_BLUE)
+    mouse_pos = pygame.mouse.get_pos()
+    left, _, right = pygame.mouse.get_pressed()
 
     if instructions:
+        screen.fill(DARK_BLUE)
         draw_text("Play Minesweeper", large_font, TEXT_COLOR, (width / 2, 50))
         rules = [
             "Click a cell to reveal it.",
@@ -82,65 +117,41 @@ while True:
         for i, rule in enumerate(rules):
             draw_text(rule, small_font, TEXT_COLOR, (width / 2, 150 + 30 * i))
 
-        play_button_rect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
-        mouse_pos = pygame.mouse.get_pos()
-        if play_button_rect.collidepoint(mouse_pos):
-            button_color = BUTTON_HOVER_COLOR
-        else:
-            button_color = BUTTON_COLOR
-        draw_button(play_button_rect, "Play Game", medium_font, TEXT_COLOR, button_color)
+        play_hovered = play_button_rect.collidepoint(mouse_pos)
+        screen.blit(play_button[play_hovered], play_button_rect)
 
-        if pygame.mouse.get_pressed()[0] and play_button_rect.collidepoint(mouse_pos):
+        if left and play_hovered:
             instructions = False
             time.sleep(0.3)
 
         pygame.display.flip()
         continue
 
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-            rect = pygame.Rect(board_origin[0] + j * cell_size, board_origin[1] + i * cell_size, cell_size, cell_size)
-            pygame.draw.rect(screen, ORANGE, rect)
-            pygame.draw.rect(screen, BLUE, rect, 3)
-
-            if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)
-            elif (i, j) in flags:
-                screen.blit(flag, rect)
-            elif (i, j) in revealed:
-                neighbors = small_font.render(str(game.nearby_mines((i, j))), True, BLACK)
-                neighbors_rect = neighbors.get_rect()
-                neighbors_rect.center = rect.center
-                screen.blit(neighbors, neighbors_rect)
-
-            row.append(rect)
-        cells.append(row)
-
-    ai_button_rect = pygame.Rect((2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50, (width / 3) - BOARD_PADDING * 2, 50)
-    mouse_pos = pygame.mouse.get_pos()
-    if ai_button_rect.collidepoint(mouse_pos):
-        button_color = BUTTON_HOVER_COLOR
-    else:
-        button_color = BUTTON_COLOR
-    draw_button(ai_button_rect, "AI Move", medium_font, TEXT_COLOR, button_color)
-
-    reset_button_rect = pygame.Rect((2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 90, (width / 3) - BOARD_PADDING * 2, 50)
-    if reset_button_rect.collidepoint(mouse_pos):
-        button_color = BUTTON_HOVER_COLOR
-    else:
-        button_color = BUTTON_COLOR
-    draw_button(reset_button_rect, "Reset", medium_font, TEXT_COLOR, button_color)
+    screen.blit(board_background, (0, 0))
+
+    for i, j in flags:
+        if not (lost and game.is_mine((i, j))):
+            screen.blit(flag, cells[i][j])
+    for i, j in revealed - flags:
+        neighbors = digits[game.nearby_mines((i, j))]
+        screen.blit(neighbors, neighbors.get_rect(center=cells[i][j].center))
+    if lost:
+        for i, j in game.mines:
+            screen.blit(mine, cells[i][j])
+
+    ai_hovered = ai_button_rect.collidepoint(mouse_pos)
+    screen.blit(ai_button[ai_hovered], ai_button_rect)
+    reset_hovered = reset_button_rect.collidepoint(mouse_pos)
+    screen.blit(reset_button[reset_hovered], reset_button_rect)
 
     status_text = "Lost" if lost else "Won" if game.mines == flags else ""
-    draw_text(status_text, medium_font, TEXT_COLOR, ((5 / 6) * width, (2 / 3) * height))
+    if status_text:
+        status = status_texts[status_text]
+        screen.blit(status, status.get_rect(center=status_center))
 
     move = None
-    left, _, right = pygame.mouse.get_pressed()
 
     if right and not lost:
-        mouse_pos = pygame.mouse.get_pos()
         for i in range(HEIGHT):
             for j in range(WIDTH):
                 if cells[i][j].collidepoint(mouse_pos) and (i, j) not in revealed:
@@ -151,9 +162,7 @@ while True:
                     time.sleep(0.2)
 
     elif left:
-        mouse_pos = pygame.mouse.get_pos()
-
-        if ai_button_rect.collidepoint(mouse_pos) and not lost:
+        if ai_hovered and not lost:
             move = ai.mace4_wrapper() or ai.mace4_move()
             if move is None:
                 flags = ai.mines.copy()
@@ -162,7 +171,7 @@ while True:
                 print("AI making move.")
             time.sleep(0.2)
 
-        elif reset_button_rect.collidepoint(mouse_pos):
+        elif reset_hovered:
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
             ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()